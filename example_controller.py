@@ -9,15 +9,19 @@ Ground-side receiver/monitor for Hivelink OCCID INAV telemetry.
 import argparse
 import asyncio
 import json
-from typing import Any, Dict, List, Sequence
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
 
 import hivelink.protocol as hl_proto
 from hivelink.datalinks import DatalinkInterface, load_nodes_map
+from hivelink.logutil import setup_logging
 from occid.schema import FlightControlState, LocationState
 
 MULTICAST_GROUP = "239.0.0.1"
 MULTICAST_PORT = 5550
 
+log = logging.getLogger("hivelink.controller")
+
 PRELOAD_MODES: List[Dict[str, Any]] = [
     {"mode": "ARM", "boxIndex": 0, "permanentId": 0, "auxChannelIndex": 0, "pwmRange": (1800, 2100)},
     {"mode": "ANGLE", "boxIndex": 3, "permanentId": 1, "auxChannelIndex": 1, "pwmRange": (900, 1200)},
@@ -36,6 +40,8 @@ class ModeMap:
         self.ids: List[int] = []
         self.names: Dict[int, str] = {}
         self.index: Dict[int, int] = {}
+        self._names_by_bit: List[str] = []
+        self._mask_cache: Dict[int, Tuple[str, ...]] = {}
         self._extend(base_modes)
         self._extend(extra_modes)
 
@@ -51,19 +57,25 @@ class ModeMap:
             self.ids.append(mode_id)
             self.index[mode_id] = idx
             self.names[mode_id] = name
+            self._names_by_bit.append(name)
 
     def names_for_mask(self, mask: int) -> List[str]:
+        # Modes only ever get appended, so a cached mask stays valid after _extend
+        hit = self._mask_cache.get(mask)
+        if hit is not None:
+            return list(hit)
+        unmapped = mask >> len(self._names_by_bit)
+        if unmapped:
+            bitpos = len(self._names_by_bit) + (unmapped & -unmapped).bit_length() - 1
+            raise ValueError(f"Bit {bitpos} set but no mode mapping available (mask={mask})")
         names: List[str] = []
-        bitpos = 0
+        table = self._names_by_bit
         remaining = mask
         while remaining:
-            if remaining & 1:
-                if bitpos >= len(self.ids):
-                    raise ValueError(f"Bit {bitpos} set but no mode mapping available (mask={mask})")
-                mode_id = self.ids[bitpos]
-                names.append(self.names[mode_id])
-            remaining >>= 1
-            bitpos += 1
+            low = remaining & -remaining
+            remaining ^= low
+            names.append(table[low.bit_length() - 1])
+        self._mask_cache[mask] = tuple(names)
         return names
 
 
@@ -73,20 +85,21 @@ async def main() -> None:
     parser.add_argument("--my_id", help="Node id from nodes.json (required if --config is not used)")
     parser.add_argument("--meshtastic", default="", help="Optional Meshtastic serial device (when not using --config)")
     parser.add_argument("--mode-ranges", required=True, help="JSON file with INAV mode ranges (from mspapi2 get_mode_ranges)")
-    parser.add_argument("--poll", type=float, default=0.2, help="Poll interval seconds for receive loop")
+    parser.add_argument("--poll", type=float, default=0.2, help="Max seconds to wait for incoming packets per loop")
+    parser.add_argument("--debug", action="store_true", help="Also log the decoded fields of every received packet")
     args = parser.parse_args()
 
-    mode_ranges_data = json.load(open(args.mode_ranges, "r"))
+    with open(args.mode_ranges, "rb") as f:
+        mode_ranges_data = json.load(f)
     if not isinstance(mode_ranges_data, list):
         raise ValueError("Mode ranges file must contain a list of mode range objects")
-    for entry in mode_ranges_data:
-        if "permanentId" not in entry:
-            raise ValueError("Each mode range entry must include permanentId")
+    # ModeMap._extend rejects entries without permanentId as it inserts them
     mode_map = ModeMap(PRELOAD_MODES, mode_ranges_data)
 
     meshtastic_dev = args.meshtastic or None
     if args.config:
-        cfg = json.load(open(args.config, "r"))
+        with open(args.config, "rb") as f:
+            cfg = json.load(f)
         my_name = cfg["my_id"]
         nodemap_cfg = cfg.get("nodemap") or {}
         nodemap = nodemap_cfg if nodemap_cfg else load_nodes_map()
@@ -107,6 +120,8 @@ async def main() -> None:
             nodemap=nodemap,
             multicast_group=cfg["udp"]["multicast_group"],
             multicast_port=int(cfg["udp"]["multicast_port"]),
+            udp_rcvbuf=2 << 20,
+            udp_sndbuf=1 << 20,
             mqtt_enable=bool(cfg["mqtt"]["use"]),
             mqtt_broker=cfg["mqtt"]["broker"],
             mqtt_port=int(cfg["mqtt"]["port"]),
@@ -136,43 +151,57 @@ async def main() -> None:
             nodemap=nodemap,
             multicast_group=MULTICAST_GROUP,
             multicast_port=MULTICAST_PORT,
+            udp_rcvbuf=2 << 20,
+            udp_sndbuf=1 << 20,
             incumbent_window=600,
         )
 
+    listener = setup_logging(logging.DEBUG if args.debug else logging.INFO)
     datalinks.start()
+    decode = hl_proto.decode_message
+    receive_async = datalinks.receive_async
+    poll = args.poll
+    # Level is fixed at startup; without --debug the per-field detail below is skipped, not just filtered
+    verbose = log.isEnabledFor(logging.DEBUG)
     try:
         while True:
-            for msg in datalinks.receive():
-                envelope, payload = hl_proto.decode_message(msg["data"])
-                print(f"[RX] from={msg['from']} via={msg['intf']} id={envelope.msg_type}")
-
-                if type(payload) == LocationState:
+            batch = await receive_async(timeout=poll)
+            for msg in batch:
+                envelope, payload = decode(msg["data"])
+                log.info("[RX] from=%s via=%s id=%s", msg["from"], msg["intf"], envelope.msg_type)
+                if not verbose:
+                    continue
+
+                ptype = type(payload)
+                if ptype is LocationState:
                     position = payload.position
                     attitude = payload.attitude
                     velocity = payload.velocity
-                    print(
-                        f"    gs={velocity.x if velocity else None} "
-                        f"hdg={attitude.heading if attitude else None} "
-                        f"alt={position.alt if position else None} "
-                        f"lat={position.lat if position else None} "
-                        f"lon={position.lon if position else None}"
+                    log.debug(
+                        "    gs=%s hdg=%s alt=%s lat=%s lon=%s",
+                        velocity.x if velocity else None,
+                        attitude.heading if attitude else None,
+                        position.alt if position else None,
+                        position.lat if position else None,
+                        position.lon if position else None,
                     )
-                elif type(payload) == FlightControlState:
+                elif ptype is FlightControlState:
                     mode_names = payload.active_mode_names or [
                         mode_map.names[mode_id] for mode_id in payload.active_modes
                     ]
-                    print(
-                        f"    armed={payload.armed} "
-                        f"flight_mode={payload.flight_mode} "
-                        f"active_modes={mode_names}"
+                    log.debug(
+                        "    armed=%s flight_mode=%s active_modes=%s",
+                        payload.armed,
+                        payload.flight_mode,
+                        mode_names,
                     )
                 else:
-                    print(f"    payload={payload.model_dump(mode='json', exclude_none=True)}")
-            await asyncio.sleep(args.poll)
+                    log.debug("    payload=%s", payload.model_dump(mode="json", exclude_none=True))
     except KeyboardInterrupt:
-        print("Receiver stopped by user")
+        log.info("Receiver stopped by user")
     finally:
         datalinks.stop()
+        listener.stop()
 
 
 if __name__ == "__main__":
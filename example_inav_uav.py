@@ -2,13 +2,18 @@
 
 import argparse
 import asyncio
-from typing import Any, Dict, List, Sequence
+import logging
+import threading
+from functools import reduce
+from operator import or_
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from mspapi2.lib import InavEnums
 from mspapi2.msp_api import MSPApi
 
 import hivelink.protocol as hl_proto
 from hivelink.datalinks import DatalinkInterface, load_nodes_map
+from hivelink.logutil import setup_logging
 from occid.schema import (
     AltitudeDatum,
     EulerAngles,
@@ -22,6 +27,8 @@ DEFAULT_BAUDRATE = 115200
 DEFAULT_READ_TIMEOUT = 0.05
 DEFAULT_WRITE_TIMEOUT = 0.25
 DEFAULT_INTERVAL_S = 5.0
+
+log = logging.getLogger("hivelink.inav")
 PRELOAD_MODES: List[Dict[str, Any]] = [
     {"mode": "ARM", "boxIndex": 0, "permanentId": 0, "auxChannelIndex": 0, "pwmRange": (1800, 2100)},
     {"mode": "ANGLE", "boxIndex": 3, "permanentId": 1, "auxChannelIndex": 1, "pwmRange": (900, 1200)},
@@ -40,6 +47,7 @@ class ModeMap:
         self.ids: List[int] = []
         self.names: Dict[int, str] = {}
         self.index: Dict[int, int] = {}
+        self._active_mask_cache: Dict[Tuple[int, ...], int] = {}
         self._extend(base_modes)
         self._extend(extra_modes)
 
@@ -57,15 +65,21 @@ class ModeMap:
             self.names[mode_id] = name
 
     def mask_from_active(self, active_modes: List[Dict[str, int]]) -> int:
-        mask = 0
+        mode_ids = []
         for entry in active_modes:
             if "permanentId" not in entry:
                 raise ValueError("Active mode entry missing permanentId")
-            mode_id = int(entry["permanentId"])
+            mode_ids.append(int(entry["permanentId"]))
+        key = tuple(sorted(mode_ids))
+        # Bit indices never change once assigned, so cached masks stay valid
+        mask = self._active_mask_cache.get(key)
+        if mask is not None:
+            return mask
+        for mode_id, entry in zip(mode_ids, active_modes):
             if mode_id not in self.index:
                 self._extend([entry])
-            bit = self.index[mode_id]
-            mask |= 1 << bit
+        mask = reduce(or_, (1 << self.index[mode_id] for mode_id in key), 0)
+        self._active_mask_cache[key] = mask
         return mask
 
 
@@ -84,11 +98,11 @@ def collect_telem_snapshot(api: MSPApi, mode_map: ModeMap) -> Dict[str, int]:
         entry.get("mode") or entry.get("boxName") or mode_map.names[int(entry["permanentId"])]
         for entry in active_modes
     ]
-    groundspeed = int(round(raw_gps["speed"]))
-    heading = int(round(attitude["yaw"]))
-    msl_alt = int(round(altitude["estimatedAltitude"]))
-    lat = int(round(raw_gps["latitude"] * 1e7))
-    lon = int(round(raw_gps["longitude"] * 1e7))
+    groundspeed = round(raw_gps["speed"])
+    heading = round(attitude["yaw"])
+    msl_alt = round(altitude["estimatedAltitude"])
+    lat = round(raw_gps["latitude"] * 1e7)
+    lon = round(raw_gps["longitude"] * 1e7)
 
     return {
         "inavmodes": mask,
@@ -103,6 +117,66 @@ def collect_telem_snapshot(api: MSPApi, mode_map: ModeMap) -> Dict[str, int]:
     }
 
 
+class MspPoller(threading.Thread):
+    """Single long-lived MSP thread that collects a fresh telemetry snapshot each time the sender asks."""
+
+    def __init__(self, api: MSPApi, mode_map: ModeMap, loop: asyncio.AbstractEventLoop):
+        super().__init__(name="msp_poller", daemon=True)
+        self.api = api
+        self.mode_map = mode_map
+        self.loop = loop
+        self._pending: Optional["asyncio.Future[Dict[str, Any]]"] = None
+        self._error: Optional[Exception] = None
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop_event.is_set():
+                return
+            fut = self._pending
+            try:
+                telemetry = collect_telem_snapshot(self.api, self.mode_map)
+            except Exception as e:
+                log.error("[MSP] telemetry poll failed, poller stopping: %s", e, exc_info=e)
+                self._error = e
+                self.loop.call_soon_threadsafe(_settle, fut, None, e)
+                return
+            self.loop.call_soon_threadsafe(_settle, fut, telemetry, None)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Wake the poller and wait for the snapshot it collects; call from the event loop thread only."""
+        if self._error is not None:
+            raise self._error
+        if self._stop_event.is_set() or not self.is_alive():
+            raise RuntimeError("MSP poller is not running")
+        fut = self._pending = self.loop.create_future()
+        self._wake.set()
+        return await fut
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join()
+
+
+def _settle(
+    fut: "Optional[asyncio.Future[Dict[str, Any]]]",
+    result: Optional[Dict[str, Any]],
+    error: Optional[Exception],
+) -> None:
+    # Runs on the event loop; the waiting sender may already have been cancelled
+    if fut is None or fut.done():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
 async def main() -> None:
     parser = argparse.ArgumentParser(description="Hivelink ↔ INAV bridge using MSPApi (direct)")
     parser.add_argument("--my_id", required=True, help="Node id as defined in nodes.json")
@@ -112,6 +186,7 @@ async def main() -> None:
     parser.add_argument("--tcp", help="Connect to MSP over TCP, HOST:PORT")
     parser.add_argument("--meshtastic", default="", help="Optional Meshtastic serial device for radio link")
     parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_S, help="Telemetry interval seconds")
+    parser.add_argument("--debug", action="store_true", help="Log every sent and received packet")
     args = parser.parse_args()
 
     if args.port and args.tcp:
@@ -142,8 +217,11 @@ async def main() -> None:
         nodemap=nodemap,
         multicast_group="239.0.0.1",
         multicast_port=5550,
+        udp_rcvbuf=2 << 20,
+        udp_sndbuf=1 << 20,
     )
     port = None if args.tcp else args.port
+    listener = setup_logging(logging.DEBUG if args.debug else logging.INFO)
     try:
         datalinks.start()
         with MSPApi(
@@ -157,63 +235,84 @@ async def main() -> None:
             variant_name = fc_variant.get("fcVariantIdentifier")
             if variant_name != "INAV":
                 raise RuntimeError(f"Flight controller variant '{variant_name}' is not INAV")
-            print(f"[MSP] Connected to INAV via {'TCP ' + args.tcp if args.tcp else port} (baud {args.baudrate})")
+            log.info("[MSP] Connected to INAV via %s (baud %s)", "TCP " + args.tcp if args.tcp else port, args.baudrate)
 
             _, mode_ranges = api.get_mode_ranges()
             mode_map = ModeMap(PRELOAD_MODES, mode_ranges)
             known_modes = [f"{mode_map.names[mid]}({mid})" for mid in mode_map.ids]
-            print(f"[MSP] Known mode ids: {', '.join(known_modes)}")
-
-            while True:
-                telemetry = await asyncio.to_thread(collect_telem_snapshot, api, mode_map)
-                location = LocationState(
-                    position=GlobalPosition(
-                        lat=telemetry["lat"] / 1e7,
-                        lon=telemetry["lon"] / 1e7,
-                        alt=telemetry["msl_alt"],
-                        alt_frame=AltitudeDatum.SEA_LEVEL,
-                    ),
-                    attitude=EulerAngles(heading=telemetry["heading"]),
-                    velocity=VelocityVector(x=telemetry["groundspeed"]),
-                )
-                control = FlightControlState(
-                    armed=0 in telemetry["active_mode_ids"],
-                    active_modes=telemetry["active_mode_ids"],
-                    active_mode_names=telemetry["active_mode_names"],
-                )
-                location_envelope = hl_proto.build_envelope(location, src=args.my_id, dst=args.dest)
-                control_envelope = hl_proto.build_envelope(control, src=args.my_id, dst=args.dest)
-                sent_location = datalinks.send(
-                    hl_proto.encode_message(location_envelope, location),
-                    dest=args.dest,
-                    udp=True,
-                    meshtastic=bool(args.meshtastic),
-                )
-                sent_control = datalinks.send(
-                    hl_proto.encode_message(control_envelope, control),
-                    dest=args.dest,
-                    udp=True,
-                    meshtastic=bool(args.meshtastic),
-                )
-                print(
-                    f"[TX] dest={args.dest} mask={telemetry['inavmodes']} "
-                    f"gs={telemetry['groundspeed']} heading={telemetry['heading']} "
-                    f"lat={telemetry['lat']} lon={telemetry['lon']} alt={telemetry['msl_alt']} "
-                    f"sent_location={sent_location} sent_control={sent_control}"
-                )
-
-                for incoming in datalinks.receive():
-                    envelope, payload_decoded = hl_proto.decode_message(incoming["data"])
-                    print(
-                        f"[RX] from={incoming['from']} id={envelope.msg_type} "
-                        f"payload={payload_decoded.model_dump(mode='json', exclude_none=True)}"
+            log.info("[MSP] Known mode ids: %s", ", ".join(known_modes))
+
+            encode_buf = bytearray()
+            poller = MspPoller(api, mode_map, asyncio.get_running_loop())
+            poller.start()
+            try:
+                while True:
+                    telemetry = await poller.snapshot()
+                    location = LocationState(
+                        position=GlobalPosition(
+                            lat=telemetry["lat"] / 1e7,
+                            lon=telemetry["lon"] / 1e7,
+                            alt=telemetry["msl_alt"],
+                            alt_frame=AltitudeDatum.SEA_LEVEL,
+                        ),
+                        attitude=EulerAngles(heading=telemetry["heading"]),
+                        velocity=VelocityVector(x=telemetry["groundspeed"]),
                     )
+                    control = FlightControlState(
+                        armed=0 in telemetry["active_mode_ids"],
+                        active_modes=telemetry["active_mode_ids"],
+                        active_mode_names=telemetry["active_mode_names"],
+                    )
+                    location_envelope = hl_proto.build_envelope(location, src=args.my_id, dst=args.dest)
+                    control_envelope = hl_proto.build_envelope(control, src=args.my_id, dst=args.dest)
+                    # Each view is released before encode_buf is reused for the next message
+                    with hl_proto.encode_message_into(location_envelope, location, encode_buf) as encoded:
+                        sent_location = datalinks.send(
+                            encoded,
+                            dest=args.dest,
+                            udp=True,
+                            meshtastic=bool(args.meshtastic),
+                        )
+                    with hl_proto.encode_message_into(control_envelope, control, encode_buf) as encoded:
+                        sent_control = datalinks.send(
+                            encoded,
+                            dest=args.dest,
+                            udp=True,
+                            meshtastic=bool(args.meshtastic),
+                        )
+                    log.debug(
+                        "[TX] dest=%s mask=%s gs=%s heading=%s lat=%s lon=%s alt=%s "
+                        "sent_location=%s sent_control=%s",
+                        args.dest,
+                        telemetry["inavmodes"],
+                        telemetry["groundspeed"],
+                        telemetry["heading"],
+                        telemetry["lat"],
+                        telemetry["lon"],
+                        telemetry["msl_alt"],
+                        sent_location,
+                        sent_control,
+                    )
+
+                    for incoming in datalinks.receive():
+                        if not log.isEnabledFor(logging.DEBUG):
+                            continue
+                        envelope, payload_decoded = hl_proto.decode_message(incoming["data"])
+                        log.debug(
+                            "[RX] from=%s id=%s payload=%s",
+                            incoming["from"],
+                            envelope.msg_type,
+                            payload_decoded.model_dump(mode="json", exclude_none=True),
+                        )
 
-                await asyncio.sleep(args.interval)
+                    await asyncio.sleep(args.interval)
+            finally:
+                poller.stop()
     except KeyboardInterrupt:
-        print("Telemetry stopped by user")
+        log.info("Telemetry stopped by user")
     finally:
         datalinks.stop()
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -9,11 +9,13 @@
 
 import asyncio
 import argparse
+import logging
 import sys
 import time
 
 import hivelink.protocol as hl_proto
 from hivelink.datalinks import DatalinkInterface, load_nodes_map
+from hivelink.logutil import setup_logging
 from occid.schema import (
     AltitudeDatum,
     EulerAngles,
@@ -23,10 +25,11 @@ from occid.schema import (
     VehicleCommand,
     VelocityVector,
 )
-import traceback
 
 from pymavlink import mavutil
 
+log = logging.getLogger("hivelink.mavlink")
+
 
 class MavlinkAP:
     def __init__(self, conn_str: str):
@@ -34,17 +37,29 @@ class MavlinkAP:
         self.master: mavutil.mavlink_connection | None = None
         self.last_hb = 0.0
 
-        # Telemetry snapshot (ints as requested)
+        # Telemetry snapshot (raw VFR_HUD values; cast to int when published)
         self.mode_str = "UNKNOWN"
         self.airspeed = 0          # m/s
         self.groundspeed = 0       # m/s
         self.heading = 0           # deg
         self.msl_alt = 0           # m (VFR_HUD.alt)
-        self.lat = None            # deg
-        self.lon = None            # deg
+        self._lat_e7 = None        # deg * 1e7 (GLOBAL_POSITION_INT)
+        self._lon_e7 = None        # deg * 1e7
+
+        # Last position handed to the telem loop, reused while the fix is unchanged
+        self._last_pos_key = None
+        self._last_pos: GlobalPosition | None = None
 
         self._running = False
 
+    @property
+    def lat(self) -> float | None:
+        return None if self._lat_e7 is None else self._lat_e7 / 1e7
+
+    @property
+    def lon(self) -> float | None:
+        return None if self._lon_e7 is None else self._lon_e7 / 1e7
+
     # ----- connection / pump -----
     def connect(self):
         # autoreconnect makes it resilient to restarts
@@ -53,9 +68,14 @@ class MavlinkAP:
             self.master.wait_heartbeat(timeout=5)
             self.last_hb = time.time()
             self._update_mode_from_master()
-            print(f"[MAV] Connected, sysid={self.master.target_system} compid={self.master.target_component} mode={self.mode_str}")
+            log.info(
+                "[MAV] Connected, sysid=%s compid=%s mode=%s",
+                self.master.target_system,
+                self.master.target_component,
+                self.mode_str,
+            )
         except Exception:
-            print("[MAV] No heartbeat yet; will continue trying.")
+            log.warning("[MAV] No heartbeat yet; will continue trying.")
 
     async def pump(self):
         """Poll MAVLink and maintain a telemetry snapshot."""
@@ -74,7 +94,7 @@ class MavlinkAP:
 
                 m = self.master.recv_match(blocking=False)
                 if m is None:
-                    await asyncio.sleep(0.05)
+                    await self._wait_readable(0.5)
                     continue
 
                 mtype = m.get_type()
@@ -86,19 +106,42 @@ class MavlinkAP:
                     self._update_mode_from_master()
                 elif mtype == "VFR_HUD":
                     # VFR_HUD.alt is meters in ArduPilot
-                    self.groundspeed = int(m.groundspeed or 0)
-                    self.airspeed = int(m.airspeed or 0)
-                    self.heading = int(m.heading or 0)
-                    self.msl_alt = int(m.alt or 0)
+                    # Stored raw; the telem loop does the int cast when it builds a payload
+                    gs = m.groundspeed
+                    self.groundspeed = 0 if gs is None else gs
+                    airspeed = m.airspeed
+                    self.airspeed = 0 if airspeed is None else airspeed
+                    heading = m.heading
+                    self.heading = 0 if heading is None else heading
+                    alt = m.alt
+                    self.msl_alt = 0 if alt is None else alt
                 elif mtype == "GLOBAL_POSITION_INT":
                     if m.lat is not None and m.lon is not None:
-                        self.lat = m.lat / 1e7
-                        self.lon = m.lon / 1e7
+                        # Scaled ints; lat/lon properties convert on read
+                        self._lat_e7 = m.lat
+                        self._lon_e7 = m.lon
                 # Extend as needed
             except Exception as e:
-                print(f"[MAV] pump error: {e}")
+                log.warning("[MAV] pump error: %s", e)
                 await asyncio.sleep(0.5)
 
+    async def _wait_readable(self, timeout: float):
+        """Sleep until the MAVLink fd has data (or timeout); falls back to a short sleep without an fd."""
+        fd = getattr(self.master, "fd", None)
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        try:
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        except (TypeError, ValueError, OSError, NotImplementedError):
+            await asyncio.sleep(0.05)
+            return
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+
     def stop(self):
         self._running = False
         try:
@@ -138,7 +181,7 @@ class MavlinkAP:
         mode = mode_str.strip().upper()
         mapping = self.master.mode_mapping()
         if not mapping or mode not in mapping:
-            print(f"[MAV] Mode '{mode}' unsupported by vehicle mapping: {mapping}")
+            log.warning("[MAV] Mode '%s' unsupported by vehicle mapping: %s", mode, mapping)
             return False
         mode_id = mapping[mode]
         self.master.mav.set_mode_send(
@@ -182,81 +225,111 @@ class MavlinkAP:
         self.set_mode("AUTO")
 
 
+# ----- Command handlers -----
+def _cmd_arm(ap: MavlinkAP, payload: VehicleCommand):
+    arm = payload.enabled
+    ap.arm(arm)
+    log.info("[CMD] ARM=%s", arm)
+
+
+def _cmd_disarm(ap: MavlinkAP, payload: VehicleCommand):
+    ap.arm(False)
+    log.info("[CMD] DISARM")
+
+
+def _cmd_set_mode(ap: MavlinkAP, payload: VehicleCommand):
+    mode = payload.mode.strip()
+    ok = ap.set_mode(mode)
+    log.info("[CMD] SET_MODE %s -> %s", mode, ok)
+
+
+def _cmd_takeoff(ap: MavlinkAP, payload: VehicleCommand):
+    alt_m = int(payload.altitude_m)
+    ap.takeoff(alt_m)
+    log.info("[CMD] TAKEOFF alt=%sm", alt_m)
+
+
+def _cmd_land(ap: MavlinkAP, payload: VehicleCommand):
+    ap.land()
+    log.info("[CMD] LAND")
+
+
+def _cmd_select_mission(ap: MavlinkAP, payload: VehicleCommand):
+    seq = int(payload.sequence)
+    ap.select_mission(seq)
+    log.info("[CMD] SELECT_MISSION seq=%s", seq)
+
+
+COMMAND_HANDLERS = {
+    FlightCommandType.ARM: _cmd_arm,
+    FlightCommandType.DISARM: _cmd_disarm,
+    FlightCommandType.SET_MODE: _cmd_set_mode,
+    FlightCommandType.TAKEOFF: _cmd_takeoff,
+    FlightCommandType.LAND: _cmd_land,
+    FlightCommandType.SELECT_MISSION: _cmd_select_mission,
+}
+
+
 # ----- Hivelink loops -----
 async def hivelink_command_loop(datalinks: DatalinkInterface, ap: MavlinkAP):
     """Receive Hivelink commands and apply to ArduPilot."""
     while True:
         try:
-            for msg in datalinks.receive():
+            batch = await datalinks.receive_async(timeout=0.1)
+            for msg in batch:
                 try:
                     envelope, payload = hl_proto.decode_message(msg["data"])
-                except Exception as e:
-                    print(f"[HL] decode error: {e}")
+                except ValueError as e:
+                    log.warning("[HL] decode error: %s", e)
                     continue
 
                 # Command handlers
                 try:
                     if type(payload) != VehicleCommand:
                         continue
-                    if payload.command_type == FlightCommandType.ARM:
-                        arm = payload.enabled
-                        ap.arm(arm)
-                        print(f"[CMD] ARM={arm}")
-                    elif payload.command_type == FlightCommandType.DISARM:
-                        ap.arm(False)
-                        print(f"[CMD] DISARM")
-                    elif payload.command_type == FlightCommandType.SET_MODE:
-                        mode = payload.mode.strip()
-                        ok = ap.set_mode(mode)
-                        print(f"[CMD] SET_MODE {mode} -> {ok}")
-                    elif payload.command_type == FlightCommandType.TAKEOFF:
-                        alt_m = int(payload.altitude_m)
-                        ap.takeoff(alt_m)
-                        print(f"[CMD] TAKEOFF alt={alt_m}m")
-                    elif payload.command_type == FlightCommandType.LAND:
-                        ap.land()
-                        print(f"[CMD] LAND")
-                    elif payload.command_type == FlightCommandType.SELECT_MISSION:
-                        seq = int(payload.sequence)
-                        ap.select_mission(seq)
-                        print(f"[CMD] SELECT_MISSION seq={seq}")
+                    handler = COMMAND_HANDLERS.get(payload.command_type)
+                    if handler is not None:
+                        handler(ap, payload)
                 except Exception as e:
-                    print(f"[CMD] error: {e}")
-
-            await asyncio.sleep(0.1)
+                    log.warning("[CMD] error: %s", e)
         except asyncio.CancelledError:
             return
         except Exception as e:
-            print(f"[HL] command loop error: {e}")
+            log.warning("[HL] command loop error: %s", e)
             await asyncio.sleep(0.2)
 
 
 async def hivelink_telem_loop(datalinks: DatalinkInterface, ap: MavlinkAP, rate_hz: float = 1.0):
     """Publish slow, high-latency telemetry."""
     period = 1.0 / max(rate_hz, 0.1)
+    encode_buf = bytearray()
     while True:
         try:
-            if ap.lat is None or ap.lon is None:
+            if ap._lat_e7 is None or ap._lon_e7 is None:
                 await asyncio.sleep(period)
                 continue
 
-            payload = LocationState(
-                position=GlobalPosition(
+            msl_alt = int(ap.msl_alt)
+            pos_key = (ap._lat_e7, ap._lon_e7, msl_alt)
+            if pos_key != ap._last_pos_key:
+                ap._last_pos = GlobalPosition(
                     lat=ap.lat,
                     lon=ap.lon,
-                    alt=ap.msl_alt,
+                    alt=msl_alt,
                     alt_frame=AltitudeDatum.SEA_LEVEL,
-                ),
-                attitude=EulerAngles(heading=ap.heading),
-                velocity=VelocityVector(x=ap.groundspeed),
+                )
+                ap._last_pos_key = pos_key
+            payload = LocationState(
+                position=ap._last_pos,
+                attitude=EulerAngles(heading=int(ap.heading)),
+                velocity=VelocityVector(x=int(ap.groundspeed)),
             )
             envelope = hl_proto.build_envelope(payload, src=datalinks.my_name, dst="")
-            encoded = hl_proto.encode_message(envelope, payload)
-            # Broadcast over all available links; adapt as you like
-            datalinks.send(encoded, dest="", meshtastic=True)
+            with hl_proto.encode_message_into(envelope, payload, encode_buf) as encoded:
+                # Broadcast over all available links; adapt as you like
+                datalinks.send(encoded, dest="", meshtastic=True)
         except Exception as e:
-            print(f"[HL] telem error: {e}")
-            print(traceback.format_exception(type(e), e, e.__traceback__))
+            log.warning("[HL] telem error: %s", e, exc_info=e)
         await asyncio.sleep(period)
 
 
@@ -266,12 +339,15 @@ async def main():
     parser.add_argument("--meshtastic_device", default="", help="Serial path to Meshtastic device")
     parser.add_argument("--mavlink", default="udp:127.0.0.1:14550", help="pymavlink connection string")
     parser.add_argument("--hl_rate", type=float, default=1.0, help="high-latency telemetry rate Hz")
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
     args = parser.parse_args()
+    listener = setup_logging(logging.DEBUG if args.debug else logging.INFO)
 
     nodemap = load_nodes_map()
     if args.my_id not in nodemap:
-        print(f"Error: Node id '{args.my_id}' not found in nodes.json")
+        log.error("Node id '%s' not found in nodes.json", args.my_id)
+        listener.stop()
         sys.exit(1)
 
     my_name = args.my_id
@@ -291,6 +367,8 @@ async def main():
         nodemap=nodemap,
         multicast_group="239.0.0.1",
         multicast_port=5550,
+        udp_rcvbuf=2 << 20,
+        udp_sndbuf=1 << 20,
         incumbent_window=600,
     )
 
@@ -318,7 +396,8 @@ async def main():
                     pass
         ap.stop()
         datalinks.stop()
-        print("Connection closed")
+        log.info("Connection closed")
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -16,10 +16,15 @@ import frogtastic
 
 session = PromptSession("> ")
 
+# Line prefix -> DatalinkInterface.send() transport flag; anything else goes over UDP
+SEND_PREFIXES = {"/mesh ": "meshtastic", "/mc ": "multicast"}
+
 
 async def send_loop(datalinks: DatalinkInterface, my_name: str):
     default_dest = "gcs1" if my_name != "gcs1" else "drone1"
     destination = default_dest
+    build_envelope = hl_proto.build_envelope
+    send_message = datalinks.send_message
     while True:
         try:
             text = await session.prompt_async()
@@ -31,18 +36,7 @@ async def send_loop(datalinks: DatalinkInterface, my_name: str):
         if text.strip().lower() in {"/q", "/quit", "/exit"}:
             return
 
-        send_mc = False
-        send_mesh = False
-        send_udp = False
-        payload_text = ""
-
-        if text.startswith("/mesh "):
-            payload_text = text[len("/mesh "):]
-            send_mesh = True
-        elif text.startswith("/mc "):
-            payload_text = text[len("/mc "):]
-            send_mc = True
-        elif text.startswith("/dest"):
+        if text.startswith("/dest"):
             parts = text.split(maxsplit=1)
             if len(parts) < 2 or not parts[1].strip():
                 print("Destination not provided")
@@ -50,36 +44,49 @@ async def send_loop(datalinks: DatalinkInterface, my_name: str):
             destination = parts[1].strip()
             print("Set destination:", destination)
             continue
-        else:
-            payload_text = text
-            send_udp = True
-
-        if send_mc or send_mesh or send_udp: 
-            payload = HumanTextMessage(
-                sender_id=my_name,
-                destination_id=destination,
-                message=payload_text,
-            )
-            envelope = hl_proto.build_envelope(payload, src=my_name, dst=destination)
-            encoded = hl_proto.encode_message(envelope, payload)
-            datalinks.send(encoded, dest=destination, meshtastic=send_mesh, multicast=send_mc, udp=send_udp)
-        
+
+        transport = "udp"
+        payload_text = text
+        for prefix, prefix_transport in SEND_PREFIXES.items():
+            if text.startswith(prefix):
+                transport = prefix_transport
+                payload_text = text[len(prefix):]
+                break
+
+        payload = HumanTextMessage(
+            sender_id=my_name,
+            destination_id=destination,
+            message=payload_text,
+        )
+        envelope = build_envelope(payload, src=my_name, dst=destination)
+        send_message(envelope, payload, dest=destination, **{transport: True})
+
+
+def print_text(msg, envelope, payload: HumanTextMessage):
+    print(f"{msg['from']}({msg['intf']}): {payload.message}")
+
+
+def print_payload(msg, envelope, payload):
+    print(f"[RECEIVED] {envelope.msg_type} from {msg['from']} via {msg['intf']}")
+    print(payload.model_dump(mode="json", exclude_none=True))
+
+
+# Payload type -> printer; anything else is dumped generically
+RX_HANDLERS = {HumanTextMessage: print_text}
 
 
 async def receive_loop(datalinks: DatalinkInterface):
+    decode = hl_proto.decode_message
+    handlers = RX_HANDLERS
     try:
-        while True:
-            for msg in datalinks.receive():
+        while datalinks.running:
+            for msg in await datalinks.receive_async():
                 try:
-                    envelope, payload = hl_proto.decode_message(msg["data"])
-                    if type(payload) == HumanTextMessage:
-                        print(f"{msg['from']}({msg['intf']}): {payload.message}")
-                    else:
-                        print(f"[RECEIVED] {envelope.msg_type} from {msg['from']} via {msg['intf']}")
-                        print(payload.model_dump(mode="json", exclude_none=True))
-                except Exception as e:
+                    envelope, payload = decode(msg["data"])
+                except ValueError as e:
                     print(f"[RECEIVED] Error decoding message: {e}")
-            await asyncio.sleep(0.1)
+                    continue
+                handlers.get(type(payload), print_payload)(msg, envelope, payload)
     except (asyncio.CancelledError, KeyboardInterrupt):
         return
 
@@ -99,38 +106,42 @@ async def main():
     parser.add_argument("--mqtt_pass", default=None, help="MQTT password")
 
     args = parser.parse_args()
-    nodemap = load_nodes_map()
-    
     if args.config:
         with open(args.config, "r") as f:
             cfg = json.load(f)
 
+        nodemap = cfg.get("nodemap") or load_nodes_map()
+        mesh_cfg = cfg["meshtastic"]
+        udp_cfg = cfg["udp"]
+        mqtt_cfg = cfg["mqtt"]
+
         my_name = cfg["my_name"]
         my_id = cfg["my_id"]
 
         # Meshtastic
-        use_meshtastic = bool(cfg["meshtastic"]["use"])
-        radio_serial = cfg["meshtastic"]["radio_serial"]
-        app_portnum = int(cfg["meshtastic"]["app_portnum"])
+        use_meshtastic = bool(mesh_cfg["use"])
+        radio_serial = mesh_cfg["radio_serial"]
+        app_portnum = int(mesh_cfg["app_portnum"])
 
         # UDP
-        use_udp = bool(cfg["udp"]["use"])
-        socket_host = cfg["udp"]["host"]
-        socket_port = int(cfg["udp"]["port"])
-        use_multicast = bool(cfg["udp"]["use_multicast"])
-        multicast_group = cfg["udp"]["multicast_group"]
-        multicast_port = int(cfg["udp"]["multicast_port"])
+        use_udp = bool(udp_cfg["use"])
+        socket_host = udp_cfg["host"]
+        socket_port = int(udp_cfg["port"])
+        use_multicast = bool(udp_cfg["use_multicast"])
+        multicast_group = udp_cfg["multicast_group"]
+        multicast_port = int(udp_cfg["multicast_port"])
 
         # MQTT
-        mqtt_enable = bool(cfg["mqtt"]["use"])
-        mqtt_base = cfg["mqtt"]["base"]
-        mqtt_broker = cfg["mqtt"]["broker"]
-        mqtt_port = int(cfg["mqtt"]["port"])
-        mqtt_client_id = cfg["mqtt"]["client_id"] if cfg["mqtt"]["client_id"] else my_name
-        mqtt_username = cfg["mqtt"]["username"]
-        mqtt_password = cfg["mqtt"]["password"]
+        mqtt_enable = bool(mqtt_cfg["use"])
+        mqtt_base = mqtt_cfg["base"]
+        mqtt_broker = mqtt_cfg["broker"]
+        mqtt_port = int(mqtt_cfg["port"])
+        mqtt_client_id = mqtt_cfg["client_id"] if mqtt_cfg["client_id"] else my_name
+        mqtt_username = mqtt_cfg["username"]
+        mqtt_password = mqtt_cfg["password"]
 
     else:
+        nodemap = load_nodes_map()
         if not args.my_id or args.my_id not in nodemap:
             print(f"Error: Node id '{args.my_id}' not found in nodes.json")
             sys.exit(1)
@@ -172,6 +183,8 @@ async def main():
         nodemap=nodemap,
         multicast_group=multicast_group,
         multicast_port=multicast_port,
+        udp_rcvbuf=2 << 20,
+        udp_sndbuf=1 << 20,
         mqtt_enable=mqtt_enable,
         mqtt_broker=mqtt_broker,
         mqtt_port=mqtt_port,
@@ -185,31 +198,24 @@ async def main():
 
     datalinks.start()
 
-    send_task = recv_task = None
     try:
         with patch_stdout():
-            send_task = asyncio.create_task(send_loop(datalinks, my_name), name="send_loop")
-            recv_task = asyncio.create_task(receive_loop(datalinks), name="recv_loop")
-
-            done, pending = await asyncio.wait({send_task, recv_task}, return_when=asyncio.FIRST_COMPLETED)
-            for t in pending:
-                t.cancel()
-                try:
-                    await t
-                except asyncio.CancelledError:
-                    pass
-    except KeyboardInterrupt:
-        for t in (send_task, recv_task):
-            if t and not t.done():
-                t.cancel()
-                try:
-                    await t
-                except asyncio.CancelledError:
-                    pass
+            async with asyncio.TaskGroup() as tg:
+                send_task = tg.create_task(send_loop(datalinks, my_name), name="send_loop")
+                recv_task = tg.create_task(receive_loop(datalinks), name="recv_loop")
+                # Both loops return normally (/quit, EOF), so stop the other one when either finishes
+                send_task.add_done_callback(lambda _t: recv_task.cancel())
+                recv_task.add_done_callback(lambda _t: send_task.cancel())
     finally:
         datalinks.stop()
         print("Connection closed")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is optional; it runs the socket readers and task scheduling in C
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -2,18 +2,22 @@ from . import protocol as _protocol
 
 PROTOCOL_NAME = _protocol.PROTOCOL_NAME
 PROTOCOL_VERSION = _protocol.PROTOCOL_VERSION
+MAX_MESSAGE_SIZE = _protocol.MAX_MESSAGE_SIZE
 PAYLOAD_MODELS = _protocol.PAYLOAD_MODELS
 message_type = _protocol.message_type
 build_envelope = _protocol.build_envelope
 encode_message = _protocol.encode_message
+encode_message_into = _protocol.encode_message_into
 decode_message = _protocol.decode_message
 
 __all__ = [
     "PROTOCOL_NAME",
     "PROTOCOL_VERSION",
+    "MAX_MESSAGE_SIZE",
     "PAYLOAD_MODELS",
     "message_type",
     "build_envelope",
     "encode_message",
+    "encode_message_into",
     "decode_message",
 ]
@@ -1,9 +1,10 @@
 # hivelink/datalinks.py
 import asyncio
 import socket
+import struct
 import warnings
 import json
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union
 import time
 import crcmod
 import sys
@@ -13,12 +14,33 @@ import traceback
 import logging, base64, faulthandler, enum, math
 import paho.mqtt.client as mqtt
 import hivelink.protocol as hl_proto
+from hivelink.recvmmsg import make_receiver
 from occid.schema import MessageEnvelope, MeshNodeState, NodeHeartbeat, OCCIDModel
+from pydantic_core import to_jsonable_python
+
+# Optional: pybase64 is a drop-in SIMD base64 codec; it speeds up decoding __b64__ fields in inbound MQTT JSON
+try:
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
+# Optional: orjson writes UTF-8 JSON bytes directly in C
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 PROTOCOL_VERSION = 1
 MAX_MESH_PACKET_SIZE = 220  # Total packet size (bytes)
 SYNC_BYTE = 0xFA
+RX_BATCH_MAX = 64  # Datagrams read per socket readiness callback
+UDP_RX_SIZE = 1024  # Max datagram size read from the UDP/multicast sockets
+MESHTASTIC_POLL_S = 0.1  # Interval of the event-loop timer that pumps Meshtastic mail into rx_buffer
 crc16 = crcmod.predefined.mkCrcFun('crc-ccitt-false')
+try:
+    import crcmod._crcfunext  # C backend used by mkCrcFun when it was built
+except ImportError:
+    warnings.warn("crcmod C extension not available; UDP CRC16 falls back to pure Python", RuntimeWarning)
 B64_TAG = "__b64__"
 
 build_envelope = hl_proto.build_envelope
@@ -31,7 +53,7 @@ def _to_jsonable(obj):
     if isinstance(obj, float):
         return obj if math.isfinite(obj) else None
     if isinstance(obj, (bytes, bytearray, memoryview)):
-        return {B64_TAG: base64.b64encode(bytes(obj)).decode("ascii")}
+        return {B64_TAG: _b64.b64encode(obj).decode("ascii")}
     if isinstance(obj, enum.IntEnum):
         return int(obj)
     if isinstance(obj, enum.Enum):
@@ -43,49 +65,85 @@ def _to_jsonable(obj):
     raise TypeError(f"Not JSON-serializable: {type(obj).__name__}")
 
 
+def _msgpack_default(obj):
+    # Called by msgpack for types it can't pack; bytes never get here, so binary fields stay raw
+    if isinstance(obj, enum.Enum):
+        return obj.name  # IntEnum already packs as int; plain enums by name, as in _to_jsonable
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return to_jsonable_python(obj)
+
+
 def _from_jsonable(obj):
     if isinstance(obj, dict):
         if B64_TAG in obj and isinstance(obj[B64_TAG], str):
-            return base64.b64decode(obj[B64_TAG].encode("ascii"))
+            return _b64.b64decode(obj[B64_TAG])
         return {k: _from_jsonable(v) for k, v in obj.items()}
     if isinstance(obj, list):
         return [_from_jsonable(v) for v in obj]
     return obj
 
 # --- UDP Packet Structure Definition ---
-# [--removed/SYNC_BYTE/--, payload length, checksum, source id, destination id, payload]
-def encode_udp_packet(source: str, destination: Optional[str], payload: bytes) -> bytes:
-    s = source.encode("utf-8")
-    d = (destination or "").encode("utf-8")
-    checksum = crc16(s + d + payload)
-    plen = len(payload)
-    packet = msgpack.packb([plen, checksum, s, d, payload])
-    return packet
-
-
-def decode_udp_packet(packet: bytes) -> Tuple[str, str, bytes]:
-    data = msgpack.unpackb(packet, use_list=True)
-    if len(data) != 5: #6
-        raise ValueError("Protocol Error: Packet length mismatch.")
-    else:
-        #syncbyte, length, checksum, source, destination, payload = data
-        length, checksum, source, destination, payload = data
-
-    #if syncbyte != SYNC_BYTE:
-    #    raise ValueError("Protocol Error: Sync byte mismatch")
-
-    plen = len(payload)
-    if plen != length:
+# [SYNC_BYTE, source id length, destination id length, payload length, checksum] + source id + destination id + payload
+UDP_HEADER = struct.Struct("!BBBHH")
+_UDP_HDR_SIZE = UDP_HEADER.size
+_pack_udp_header = UDP_HEADER.pack
+_unpack_udp_header = UDP_HEADER.unpack_from
+_HAVE_SENDMSG = hasattr(socket.socket, "sendmsg")  # not on Windows
+
+
+def _udp_packet_parts(source: Union[str, bytes], destination: Union[str, bytes, None], payload: bytes) -> Tuple[bytes, bytes, bytes, bytes]:
+    # Ids may be passed pre-encoded to skip the UTF-8 encode
+    s = source if isinstance(source, bytes) else source.encode("utf-8")
+    d = destination if isinstance(destination, bytes) else (destination or "").encode("utf-8")
+    checksum = crc16(payload, crc16(d, crc16(s)))
+    return _pack_udp_header(SYNC_BYTE, len(s), len(d), len(payload), checksum), s, d, payload
+
+
+def encode_udp_packet(source: Union[str, bytes], destination: Union[str, bytes, None], payload: bytes) -> bytes:
+    return b"".join(_udp_packet_parts(source, destination, payload))
+
+
+def decode_udp_packet(packet: bytes, names: Optional[Dict[bytes, str]] = None) -> Tuple[str, str, bytes]:
+    if len(packet) < _UDP_HDR_SIZE:
+        raise ValueError("Protocol Error: Packet too short.")
+    syncbyte, slen, dlen, length, checksum = _unpack_udp_header(packet, 0)
+    if syncbyte != SYNC_BYTE:
+        raise ValueError("Protocol Error: Sync byte mismatch")
+
+    start = _UDP_HDR_SIZE
+    if len(packet) != start + slen + dlen + length:
         raise ValueError("Protocol Error: Length mismatch")
+    source = packet[start:start + slen]
+    destination = packet[start + slen:start + slen + dlen]
+    payload = packet[start + slen + dlen:]
 
     # Verify checksum
-    calc_checksum = crc16(source + destination + payload)
+    calc_checksum = crc16(payload, crc16(destination, crc16(source)))
     if calc_checksum != checksum:
         raise ValueError("Protocol Error: Checksum mismatch.")
 
+    if names:
+        # Known ids resolve without a UTF-8 decode
+        src = names.get(source) or source.decode("utf-8")
+        dst = names.get(destination) or destination.decode("utf-8")
+        return src, dst, payload
     return source.decode("utf-8"), destination.decode("utf-8"), payload
 
 
+class NodeSeen:
+    """Presence record kept in DatalinkInterface.localnodes; last_seen is wall-clock, last_seen_ns monotonic (0 = never heard)."""
+
+    __slots__ = ("last_seen", "last_seen_ns", "intf", "rssi", "latency")
+
+    def __init__(self, last_seen: int, last_seen_ns: int, intf: str, rssi=None, latency=None):
+        self.last_seen = last_seen
+        self.last_seen_ns = last_seen_ns
+        self.intf = intf
+        self.rssi = rssi
+        self.latency = latency
+
+
 class DatalinkInterface:
     def __init__(
         self,
@@ -103,6 +161,8 @@ class DatalinkInterface:
         nodemap: Dict[str, Dict[str, Any]] = {},
         multicast_group: str = "",
         multicast_port: Optional[int] = None,
+        udp_rcvbuf: Optional[int] = None,
+        udp_sndbuf: Optional[int] = None,
         mqtt_enable: bool = False,
         mqtt_broker: str = "",
         mqtt_port: int = 1883,
@@ -110,6 +170,7 @@ class DatalinkInterface:
         mqtt_username: Optional[str] = None,
         mqtt_password: Optional[str] = None,
         mqtt_base: str = "/hivelink/v1",
+        mqtt_msgpack: bool = False,
         incumbent_window: int = 600,
     ):
         if not (use_meshtastic or use_udp):
@@ -123,18 +184,31 @@ class DatalinkInterface:
 
         self.socket_host = socket_host
         self.socket_port = socket_port
+        # Kernel socket buffer sizes in bytes; None keeps the OS default
+        self.udp_rcvbuf = udp_rcvbuf
+        self.udp_sndbuf = udp_sndbuf
 
         self.udp_sock = None
         self.multicast_sock = None
+        self._udp_tx = None
+        self._mc_tx = None
+        self._mreq = b""  # group + interface address, set in start() when multicast is joined
         self.rx_buffer: List[Dict[str, Any]] = []
+        self._rx_event = asyncio.Event()
+        self._mmsg = None
+        self._tx_buf = bytearray()  # Grows to the largest message sent through send_message
         self.running = False
         self.loop = asyncio.get_event_loop()
         self.meshmap: Dict[int, str] = {}
+        self.udp_addrs: Dict[str, Tuple[str, int]] = {}
+        self._name_b: Dict[str, bytes] = {}
+        self._name_s: Dict[bytes, str] = {}
 
         # Meshtastic
         self.use_meshtastic = use_meshtastic
         self.meshid = my_id
         self.mesh_client = None
+        self._mesh_timer = None
         self.radio_port = radio_port
         self.link_port = meshtastic_dataport
         self.meshtastic_channel = meshtastic_channel
@@ -144,8 +218,9 @@ class DatalinkInterface:
         self.multicast_port = multicast_port if multicast_port is not None else self.socket_port
 
         # Presence/incumbent tracking
-        self.localnodes: Dict[str, Dict[str, Any]] = {}
+        self.localnodes: Dict[str, NodeSeen] = {}
         self.incumbent_window = int(incumbent_window)
+        self._incumbent_window_ns = self.incumbent_window * 1_000_000_000
 
         # MQTT
         self.mqtt_enable = bool(mqtt_enable and mqtt is not None and mqtt_broker)
@@ -155,23 +230,25 @@ class DatalinkInterface:
         self.mqtt_username = mqtt_username
         self.mqtt_password = mqtt_password
         self.mqtt_base = mqtt_base.rstrip("/")
+        self._mqtt_to_prefix = f"{self.mqtt_base}/to/"
+        # Publish msgpack bodies (bytes fields packed as raw bin) instead of JSON; inbound accepts either
+        self.mqtt_msgpack = bool(mqtt_msgpack)
         self.mqtt_client = None
         self._mqtt_connected = False
+        self._topic_cache: Dict[Tuple[str, str], str] = {}
 
     # ---------- Presence / incumbent ----------
     def update_localnode_seen(self, src: str, intf: str, rssi=None, latency=None, ts: Optional[float] = None):
-        self.localnodes[src] = {
-            "last_seen": int(ts if ts is not None else 0),
-            "intf": intf,
-            "rssi": rssi,
-            "latency": latency,
-        }
+        # Without a timestamp (MQTT presence hints) the node is recorded but never counts as incumbent
+        self.localnodes[src] = NodeSeen(
+            int(ts if ts is not None else 0), time.monotonic_ns() if ts is not None else 0, intf, rssi, latency
+        )
 
     def is_incumbent_for(self, dest_id: str) -> bool:
         nfo = self.localnodes.get(dest_id)
-        if not nfo:
+        if not nfo or not nfo.last_seen_ns:
             return False
-        return (time.time() - nfo["last_seen"]) <= self.incumbent_window
+        return (time.monotonic_ns() - nfo.last_seen_ns) <= self._incumbent_window_ns
 
     # ---------- Mesh node id mapping ----------
     def map_mesh_nodes(self):
@@ -180,19 +257,57 @@ class DatalinkInterface:
             if meshid:
                 self.meshmap[meshid] = name
 
+    def map_udp_addrs(self):
+        self.udp_addrs = {
+            name: (info["ip"][0], int(info["ip"][1]))
+            for name, info in self.nodemap.items()
+            if info.get("ip")
+        }
+        # UTF-8 forms of known node ids for the UDP framing, both directions
+        self._name_b = {name: name.encode("utf-8") for name in (*self.nodemap, self.my_name)}
+        self._name_s = {b: name for name, b in self._name_b.items()}
+
     # ---------- MQTT helpers ----------
     def _topic_from_msg(self, envelope: MessageEnvelope) -> str:
-        return f"{self.mqtt_base}/from/{envelope.src}/{envelope.msg_type}"
-
-
-    def _json_envelope(self, intf: str, envelope: MessageEnvelope, payload: OCCIDModel, tstamp: float) -> bytes:
+        key = (envelope.src, envelope.msg_type)
+        try:
+            return self._topic_cache[key]
+        except KeyError:
+            topic = f"{self.mqtt_base}/from/{key[0]}/{key[1]}"
+            # src comes off the wire; only known nodes are cached so the dict stays bounded
+            if key[0] in self.nodemap:
+                self._topic_cache[key] = topic
+            return topic
+
+
+    def _mqtt_envelope(self, intf: str, envelope: MessageEnvelope, payload: OCCIDModel, tstamp: float) -> bytes:
+        if self.mqtt_msgpack:
+            # Python-mode dump keeps bytes fields as bytes, which use_bin_type carries as msgpack bin
+            body = {
+                "intf": intf,
+                "envelope": envelope.model_dump(mode="python", exclude_none=True),
+                "payload": payload.model_dump(mode="python", exclude_none=True),
+                "from": envelope.src,
+                "time": int(tstamp),
+            }
+            return msgpack.packb(body, use_bin_type=True, default=_msgpack_default)
         body = {
             "intf": intf,
-            "envelope": _to_jsonable(envelope.model_dump(mode="json", exclude_none=True)),
-            "payload": _to_jsonable(payload.model_dump(mode="json", exclude_none=True)),
+            "envelope": envelope.model_dump(mode="json", exclude_none=True),
+            "payload": payload.model_dump(mode="json", exclude_none=True),
             "from": envelope.src,
             "time": int(tstamp),
         }
+        if orjson is not None:
+            # Common case: plain JSON types serialise in one C call; anything orjson rejects takes the walk below
+            try:
+                return orjson.dumps(body)
+            except TypeError:
+                pass
+        body["envelope"] = _to_jsonable(body["envelope"])
+        body["payload"] = _to_jsonable(body["payload"])
+        if orjson is not None:
+            return orjson.dumps(body)
         return json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 
@@ -235,18 +350,30 @@ class DatalinkInterface:
 
     def _on_mqtt_message(self, _client, _userdata, m):
         try:
-            # Topic: /hivelink/v1/to/<dest>/<OCCIDModelName>
-            parts = m.topic.strip("/").split("/")
-            if len(parts) < 5:
+            # Topic: <mqtt_base>/to/<dest>/<OCCIDModelName>
+            topic = m.topic
+            if not topic.startswith(self._mqtt_to_prefix):
                 return
-            _, _, direction, dest_id, msg_type = parts[:5]
-            if direction != "to":
+            dest_id, sep, msg_type = topic[len(self._mqtt_to_prefix):].partition("/")
+            if not sep:
                 return
-
-            body = json.loads(m.payload.decode("utf-8"))
-            if not isinstance(body, dict):
+            # Unknown model names are dropped before the body is parsed
+            payload_model = hl_proto.PAYLOAD_MODELS.get(msg_type)
+            if payload_model is None:
                 return
-            payload_data = _from_jsonable(body["payload"])
+
+            raw = m.payload
+            if raw.lstrip()[:1] == b"{":
+                # Both parsers take the UTF-8 bytes directly
+                body = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                if not isinstance(body, dict):
+                    return
+                payload_data = _from_jsonable(body["payload"])
+            else:
+                body = msgpack.unpackb(raw, raw=False)
+                if not isinstance(body, dict):
+                    return
+                payload_data = body["payload"]
 
             # Optional: allow external systems to update presence
             src_hint = body["from"]
@@ -257,7 +384,7 @@ class DatalinkInterface:
             if not self.is_incumbent_for(dest_id):
                 return
 
-            payload = hl_proto.PAYLOAD_MODELS[msg_type].model_validate(payload_data)
+            payload = payload_model.model_validate(payload_data)
             envelope = build_envelope(payload, src=src_hint, dst=dest_id)
             encoded = encode_message(envelope, payload)
 
@@ -288,17 +415,29 @@ class DatalinkInterface:
 
 
     # ---------- Lifecycle ----------
+    def _tune_socket(self, sock: socket.socket):
+        if self.udp_rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.udp_rcvbuf)
+        if self.udp_sndbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.udp_sndbuf)
+
     def start(self):
         if self.use_udp:
             print("Interface using UDP")
             self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                self.udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except AttributeError:
+                pass
+            self._tune_socket(self.udp_sock)
             self.udp_sock.setblocking(False)
             self.udp_sock.bind((self.socket_host, self.socket_port))
 
             if self.use_multicast:
                 if self.multicast_group == "" or not self.multicast_port:
                     raise ValueError("Group+port must be specified when using Multicast.")
+                host_in_addr = socket.inet_aton(self.socket_host)
                 print(f"Interface using UDP Multicast on group {self.multicast_group} port {self.multicast_port}")
                 self.multicast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
                 self.multicast_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -306,12 +445,33 @@ class DatalinkInterface:
                     self.multicast_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
                 except AttributeError:
                     pass
+                self._tune_socket(self.multicast_sock)
                 self.multicast_sock.bind(("", self.multicast_port))
-                self.multicast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.socket_host))
-                mreq = socket.inet_aton(self.multicast_group) + socket.inet_aton(self.socket_host)
-                self.multicast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+                self.multicast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, host_in_addr)
+                self._mreq = socket.inet_aton(self.multicast_group) + host_in_addr
+                self.multicast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, self._mreq)
                 self.multicast_sock.setblocking(False)
 
+            # Long-lived send sockets, configured once; non-blocking so a full send buffer drops
+            # the datagram (send() returns False) instead of stalling the event loop
+            self._udp_tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp_tx.setblocking(False)
+            self._tune_socket(self._udp_tx)
+            if self.multicast_group != "":
+                mc_tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+                try:
+                    mc_tx.setblocking(False)
+                    self._tune_socket(mc_tx)
+                    mc_tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.socket_host))
+                    mc_tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 0)
+                    mc_tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+                except OSError as e:
+                    # Multicast sends need a dotted-quad socket_host; unicast UDP still works without one
+                    mc_tx.close()
+                    warnings.warn(f"Multicast send disabled: {str(e)}")
+                else:
+                    self._mc_tx = mc_tx
+
         if self.use_meshtastic:
             print("Interface using Meshtastic")
             if not self.radio_port:
@@ -323,12 +483,19 @@ class DatalinkInterface:
 
         self.running = True
         if self.use_udp:
-            asyncio.create_task(self._listen())
+            # recvmmsg batch reader where the platform has it (Linux); recvfrom loop otherwise
+            self._mmsg = make_receiver(RX_BATCH_MAX, UDP_RX_SIZE)
+            print(f"UDP Listening on {self.socket_host}:{self.socket_port}")
+            self.loop.add_reader(self.udp_sock.fileno(), self._on_readable, self.udp_sock, "udp")
+            if self.multicast_sock:
+                self.loop.add_reader(self.multicast_sock.fileno(), self._on_readable, self.multicast_sock, "multicast")
         self.map_mesh_nodes()
+        self.map_udp_addrs()
         print("Connected to interfaces")
         if self.use_meshtastic and self.mesh_client:
             self.meshid = self.mesh_client.meshint.getMyNodeInfo()['num']
             print(f"[INIT] My meshtastic ID: {self.meshid}")    
+            self._mesh_timer = self.loop.call_later(MESHTASTIC_POLL_S, self._pump_mesh)
         payload = NodeHeartbeat(
             node_id=self.my_name,
             last_seen_ts=time.time(),
@@ -339,6 +506,8 @@ class DatalinkInterface:
 
     def stop(self):
         self.running = False
+        # Release anyone blocked in receive_async() now rather than at their timeout
+        self._rx_event.set()
 
         # MQTT offline notice
         if self.mqtt_enable and self.mqtt_client is not None:
@@ -355,6 +524,7 @@ class DatalinkInterface:
 
         if self.udp_sock:
             try:
+                self.loop.remove_reader(self.udp_sock.fileno())
                 self.udp_sock.close()
             except Exception:
                 pass
@@ -364,15 +534,27 @@ class DatalinkInterface:
             try:
                 # Best effort drop membership
                 try:
-                    mreq = socket.inet_aton(self.multicast_group) + socket.inet_aton(self.socket_host)
-                    self.multicast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_DROP_MEMBERSHIP, mreq)
+                    self.multicast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_DROP_MEMBERSHIP, self._mreq)
                 except Exception:
                     pass
+                self.loop.remove_reader(self.multicast_sock.fileno())
                 self.multicast_sock.close()
             except Exception:
                 pass
             self.multicast_sock = None
 
+        for tx in (self._udp_tx, self._mc_tx):
+            if tx:
+                try:
+                    tx.close()
+                except Exception:
+                    pass
+        self._udp_tx = None
+        self._mc_tx = None
+
+        if self._mesh_timer is not None:
+            self._mesh_timer.cancel()
+            self._mesh_timer = None
         if self.mesh_client:
             try:
                 self.mesh_client.meshint.close()
@@ -383,44 +565,60 @@ class DatalinkInterface:
         print("Interfaces stopped")
 
     # ---------- I/O ----------
-    async def _listen(self):
-        print(f"UDP Listening on {self.socket_host}:{self.socket_port}")
-        while self.running:
-            if self.use_udp and self.udp_sock:
-                try:
-                    data, addr = await self.loop.run_in_executor(None, self.udp_sock.recvfrom, 1024)
-                    source, dest, data = decode_udp_packet(data)
-                    if data:
-                        self.rx_buffer.append({"intf": "udp", "data": data, "from": source, "time": time.time()})
-                except Exception as e:
-                    err = str(e)
-                    if "[Errno 11] Resource temporarily unavailable" not in err:
-                        warnings.warn(f"Datalink UDP listen error: {str(e)}")
-
-            if self.multicast_sock:
-                try:
-                    data, addr = await self.loop.run_in_executor(None, self.multicast_sock.recvfrom, 1024)
-                    source, dest, data = decode_udp_packet(data)
-                    if data:
-                        self.rx_buffer.append({"intf": "multicast", "data": data, "from": source, "time": time.time()})
-                except Exception as e:
-                    err = str(e)
-                    if "[Errno 11] Resource temporarily unavailable" not in err:
-                        warnings.warn(f"Datalink Multicast listen error: {str(e)}")
-            await asyncio.sleep(0.1)
+    def _read_datagrams(self, sock: socket.socket) -> List[bytes]:
+        # Drain whatever is queued on the socket per wakeup, bounded so other callbacks still run
+        if self._mmsg is not None:
+            return self._mmsg.recv(sock.fileno())
+        datagrams = []
+        for _ in range(RX_BATCH_MAX):
+            try:
+                data = sock.recv(UDP_RX_SIZE)  # sender address is unused; skip building it
+            except (BlockingIOError, InterruptedError):
+                break
+            datagrams.append(data)
+        return datagrams
+
+    def _on_readable(self, sock: socket.socket, intf: str):
+        label = "UDP" if intf == "udp" else "Multicast"
+        try:
+            datagrams = self._read_datagrams(sock)
+        except OSError as e:
+            warnings.warn(f"Datalink {label} listen error: {str(e)}")
+            return
+        received = False
+        now = time.time()  # one receive timestamp per drained batch
+        for data in datagrams:
+            try:
+                source, dest, data = decode_udp_packet(data, self._name_s)
+            except Exception as e:
+                warnings.warn(f"Datalink {label} listen error: {str(e)}")
+                continue
+            if data:
+                self.rx_buffer.append({"intf": intf, "data": data, "from": source, "time": now})
+                received = True
+        if received:
+            self._rx_event.set()
 
     def _publish_to_mqtt(self, intf: str, envelope: MessageEnvelope, payload: OCCIDModel, tstamp: float):
         if not (self.mqtt_enable and self.mqtt_client and self._mqtt_connected):
             return
         try:
             topic = self._topic_from_msg(envelope)
-            env = self._json_envelope(intf, envelope, payload, tstamp)
+            env = self._mqtt_envelope(intf, envelope, payload, tstamp)
             self.mqtt_client.publish(topic, env, qos=0, retain=False)
         except Exception as e:
             sys.__stderr__.write(f"MQTT publish failed: {e}\n")
             traceback.print_exc(file=sys.__stderr__)
             sys.__stderr__.flush()
 
+    def _send_frame(self, sock: socket.socket, dest: Union[str, bytes, None], data: bytes, addr: Tuple[str, int]):
+        parts = _udp_packet_parts(self._name_b.get(self.my_name, self.my_name), dest, data)
+        if _HAVE_SENDMSG:
+            # Scatter-gather: the kernel assembles header + ids + payload, no joined copy in Python
+            sock.sendmsg(parts, (), 0, addr)
+        else:
+            sock.sendto(b"".join(parts), addr)
+
     def send(
         self,
         data: bytes,
@@ -434,22 +632,15 @@ class DatalinkInterface:
 
         try:
             if self.use_udp:
+                name_b = self._name_b
                 if multicast and self.multicast_group != "":
-                    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as send_sock:
-                        send_sock.settimeout(2.0)
-                        send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.socket_host))
-                        send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 0)
-                        send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
-                        encdat = encode_udp_packet(source=self.my_name, destination=dest, payload=data)
-                        send_sock.sendto(encdat, (self.multicast_group, self.multicast_port))
-                        sent = True
-                elif dest in self.nodemap and udp:
-                    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as send_sock:
-                        send_sock.settimeout(2.0)
-                        addr = self.nodemap[dest]["ip"]
-                        encdat = encode_udp_packet(source=self.my_name, destination=dest, payload=data)
-                        send_sock.sendto(encdat, tuple(addr))
-                        sent = True
+                    if self._mc_tx is None:
+                        raise OSError("multicast send socket unavailable")
+                    self._send_frame(self._mc_tx, name_b.get(dest, dest), data, (self.multicast_group, self.multicast_port))
+                    sent = True
+                elif udp and dest in self.udp_addrs:
+                    self._send_frame(self._udp_tx, name_b.get(dest, dest), data, self.udp_addrs[dest])
+                    sent = True
         except Exception as e:
             warnings.warn(f"Datalink UDP Send failed: {str(e)}")
             return False
@@ -459,7 +650,7 @@ class DatalinkInterface:
             if self.use_meshtastic and self.mesh_client and meshtastic:
                 dest_meshid = "^all" if dest is None or dest == "" else self.nodemap[dest]["meshid"]
                 self.mesh_client.meshint.sendData(
-                    data,
+                    bytes(data),
                     destinationId=dest_meshid,
                     portNum=self.link_port,
                     channelIndex=self.meshtastic_channel,
@@ -473,37 +664,70 @@ class DatalinkInterface:
 
         return sent
 
+    def send_message(self, envelope: MessageEnvelope, payload: OCCIDModel, dest: Optional[str] = None, **flags) -> bool:
+        # Encodes into the interface's reusable TX buffer; call from the event loop thread only
+        with hl_proto.encode_message_into(envelope, payload, self._tx_buf) as encoded:
+            return self.send(encoded, dest=dest, **flags)
+
+
+    def _pull_mesh_mail(self) -> bool:
+        received = False
+        try:
+            for msg in self.mesh_client.checkMail():
+                if msg.get("port") == self.link_port:
+                    try:
+                        senderid_hex = msg.get("senderid", "").lstrip("!")
+                        senderid = int(senderid_hex, 16) if senderid_hex else 0
+                        source = self.meshmap.get(senderid, str(senderid))
+                    except Exception:
+                        source = "unknown"
+                    self.rx_buffer.append(
+                        {"intf": "meshtastic", "data": msg["data"], "from": source, "time": msg.get("time", time.time())}
+                    )
+                    received = True
+        except Exception as e:
+            warnings.warn(f"Meshtastic receive error: {e}")
+        return received
+
+    def _pump_mesh(self):
+        # Runs on the event loop next to the UDP readers, so receive_async wakes for mesh mail too
+        self._mesh_timer = None
+        if not self.running or self.mesh_client is None:
+            return
+        if self._pull_mesh_mail():
+            self._rx_event.set()
+        self._mesh_timer = self.loop.call_later(MESHTASTIC_POLL_S, self._pump_mesh)
 
     def receive(self) -> List[Dict[str, Any]]:
         # Pull from Meshtastic mailbox
         if self.mesh_client is not None:
-            try:
-                for msg in self.mesh_client.checkMail():
-                    if msg.get("port") == self.link_port:
-                        try:
-                            senderid_hex = msg.get("senderid", "").lstrip("!")
-                            senderid = int(senderid_hex, 16) if senderid_hex else 0
-                            source = self.meshmap.get(senderid, str(senderid))
-                        except Exception:
-                            source = "unknown"
-                        self.rx_buffer.append(
-                            {"intf": "meshtastic", "data": msg["data"], "from": source, "time": msg.get("time", time.time())}
-                        )
-            except Exception as e:
-                warnings.warn(f"Meshtastic receive error: {e}")
+            self._pull_mesh_mail()
 
-        # Drain buffer (single shot)
-        messages = self.rx_buffer.copy()
-        self.rx_buffer.clear()
+        # Drain buffer (single shot): swap in a fresh list rather than copy + clear
+        messages, self.rx_buffer = self.rx_buffer, []
 
         # Presence update and optional MQTT publish (decoded here; the caller still gets raw)
+        publish = self.mqtt_enable and self.mqtt_client is not None and self._mqtt_connected
         for msg in messages:
-            self.update_localnode_seen(msg["from"], msg["intf"], ts=msg.get("time", time.time()))
-            envelope, payload = decode_message(msg["data"])
-            self._publish_to_mqtt(msg["intf"], envelope, payload, msg.get("time", time.time()))
+            # Every rx_buffer entry is stamped on arrival
+            tstamp = msg["time"]
+            self.update_localnode_seen(msg["from"], msg["intf"], ts=tstamp)
+            if publish:
+                envelope, payload = decode_message(msg["data"])
+                self._publish_to_mqtt(msg["intf"], envelope, payload, tstamp)
 
         return messages
 
+    async def receive_async(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Like receive(), but first waits for an incoming packet (or timeout) when nothing is buffered."""
+        if self.running and not self.rx_buffer:
+            self._rx_event.clear()
+            try:
+                await asyncio.wait_for(self._rx_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.receive()
+
 
 def load_nodes_map(path: str = "nodes.json") -> Dict[str, Any]:
     with open(path, "r") as file:
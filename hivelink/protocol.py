@@ -12,6 +12,7 @@ print(envelope.msg_type, decoded.message)
 PY
 """
 
+import threading
 from time import time
 from uuid import uuid4
 
@@ -19,9 +20,19 @@ import msgpack
 import occid.schema as occid_schema
 from occid.schema import MessageEnvelope, OCCIDModel
 
+# Optional: msgspec's C msgpack codec is wire-compatible and faster than msgpack-python
+try:
+    from msgspec import msgpack as _fast_msgpack
+except ImportError:
+    _fast_msgpack = None
+    _encoder = None
+else:
+    _encoder = _fast_msgpack.Encoder()  # Reused for every encode; safe to share across threads
+
 
 PROTOCOL_NAME = "hivelink-occid"
 PROTOCOL_VERSION = (1, 0, 0)
+MAX_MESSAGE_SIZE = 65507  # Largest UDP datagram payload
 
 PAYLOAD_MODELS: dict[str, type[OCCIDModel]] = {
     name: model
@@ -54,18 +65,69 @@ def build_envelope(
     )
 
 
-def encode_message(envelope: MessageEnvelope, payload: OCCIDModel) -> bytes:
-    packet = {
+_local = threading.local()
+
+
+def _packer() -> msgpack.Packer:
+    packer = getattr(_local, "packer", None)
+    if packer is None:
+        packer = _local.packer = msgpack.Packer(use_bin_type=True, autoreset=False)
+    return packer
+
+
+def _packet(envelope: MessageEnvelope, payload: OCCIDModel) -> dict:
+    return {
         "envelope": envelope.model_dump(mode="json", exclude_none=True),
         "payload": payload.model_dump(mode="json", exclude_none=True),
     }
-    return msgpack.packb(packet, use_bin_type=True)
+
+
+def encode_message(envelope: MessageEnvelope, payload: OCCIDModel) -> bytes:
+    packet = _packet(envelope, payload)
+    if _encoder is not None:
+        return _encoder.encode(packet)
+    packer = _packer()
+    try:
+        packer.pack(packet)
+        return packer.bytes()
+    finally:
+        packer.reset()
+
+
+def encode_message_into(envelope: MessageEnvelope, payload: OCCIDModel, out: bytearray) -> memoryview:
+    """Encode like encode_message, writing into a caller-owned buffer that is resized to fit.
+
+    Returns a view of out. Release it (or use it as a context manager) before the next call
+    with the same buffer: a bytearray with live views cannot be resized.
+    """
+    packet = _packet(envelope, payload)
+    if _encoder is not None:
+        # msgspec writes straight into out, no intermediate bytes
+        _encoder.encode_into(packet, out)
+        return memoryview(out)
+    # msgpack-python has no pack-into; copy once from the packer's internal buffer
+    packer = _packer()
+    try:
+        packer.pack(packet)
+        with packer.getbuffer() as packed:
+            out[:] = packed
+    finally:
+        packer.reset()
+    return memoryview(out)
 
 
 def decode_message(data: bytes) -> tuple[MessageEnvelope, OCCIDModel]:
-    packet = msgpack.unpackb(data, raw=False)
+    if _fast_msgpack is not None:
+        packet = _fast_msgpack.decode(data)
+    else:
+        packet = msgpack.unpackb(data, raw=False)
+    # Every failure surfaces as ValueError (msgpack/msgspec and pydantic errors already are)
+    if not isinstance(packet, dict) or "envelope" not in packet or "payload" not in packet:
+        raise ValueError("Protocol Error: malformed message")
     envelope = MessageEnvelope.model_validate(packet["envelope"])
-    payload_model = PAYLOAD_MODELS[envelope.msg_type]
+    payload_model = PAYLOAD_MODELS.get(envelope.msg_type)
+    if payload_model is None:
+        raise ValueError(f"Protocol Error: unknown message type {envelope.msg_type!r}")
     payload = payload_model.model_validate(packet["payload"])
     return envelope, payload
 
@@ -73,9 +135,11 @@ def decode_message(data: bytes) -> tuple[MessageEnvelope, OCCIDModel]:
 __all__ = [
     "PROTOCOL_NAME",
     "PROTOCOL_VERSION",
+    "MAX_MESSAGE_SIZE",
     "PAYLOAD_MODELS",
     "message_type",
     "build_envelope",
     "encode_message",
+    "encode_message_into",
     "decode_message",
 ]
@@ -0,0 +1,82 @@
+# hivelink/recvmmsg.py
+# Linux recvmmsg(2) via ctypes: read a batch of datagrams with one syscall.
+import ctypes
+import ctypes.util
+import errno
+import os
+import sys
+from typing import List, Optional
+
+MSG_DONTWAIT = 0x40
+
+
+class _Iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _Msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_Iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _Mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _Msghdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_recvmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fn = libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_Mmsghdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    fn.restype = ctypes.c_int
+    return fn
+
+
+_recvmmsg = _load_recvmmsg()
+HAVE_RECVMMSG = _recvmmsg is not None
+
+
+class MmsgReceiver:
+    """Preallocated buffers for reading up to `count` datagrams of `size` bytes per recvmmsg call."""
+
+    def __init__(self, count: int, size: int):
+        if not HAVE_RECVMMSG:
+            raise OSError("recvmmsg is not available on this platform")
+        self.count = count
+        self.size = size
+        self._bufs = (ctypes.c_char * (count * size))()
+        self._iov = (_Iovec * count)()
+        self._hdrs = (_Mmsghdr * count)()
+        base = ctypes.addressof(self._bufs)
+        for i in range(count):
+            self._iov[i].iov_base = base + i * size
+            self._iov[i].iov_len = size
+            self._hdrs[i].msg_hdr.msg_iov = ctypes.pointer(self._iov[i])
+            self._hdrs[i].msg_hdr.msg_iovlen = 1
+
+    def recv(self, fd: int) -> List[bytes]:
+        n = _recvmmsg(fd, self._hdrs, self.count, MSG_DONTWAIT, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return []
+            raise OSError(err, os.strerror(err))
+        base = ctypes.addressof(self._bufs)
+        size = self.size
+        hdrs = self._hdrs
+        return [ctypes.string_at(base + i * size, hdrs[i].msg_len) for i in range(n)]
+
+
+def make_receiver(count: int, size: int) -> Optional[MmsgReceiver]:
+    return MmsgReceiver(count, size) if HAVE_RECVMMSG else None